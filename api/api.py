@@ -1,12 +1,14 @@
 """REST API for computing B-spline curves."""
 import os
 import re
-import json
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone
+from typing import Annotated, Literal, get_args
 import aiohttp
-from fastapi import FastAPI
+from fastapi import FastAPI, Query, UploadFile
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import ValidationError
+from fastapi.responses import Response, StreamingResponse
 from pydantic_string_url import HttpUrl
 import numpy as np
 from fastapi_simple_errors import (
@@ -16,19 +18,68 @@ from fastapi_simple_errors import (
 )
 
 from lib.globe import GlobePoint, Point
-from lib.spline import BSpline
-from lib.geo import arclen, curvature, speed
+from lib.curve import SampledCurve, CurveCache
+from lib.fit import fit, fit_tolerance
+from lib.track import read_track
+from lib.export import export, MEDIA_TYPES
+from lib.project import ColumnarProject, ColumnarCurve, ProjectJsonError, ProjectSchemaError
 from lib.util import generate_id
-from lib.types import CurveInput, CurveOutput, PublishInput, PublishOutput, Project, ProjectStore
+from lib.types import (
+    CurveInput, CurveOutput, CurveField, CurveSummary, NearestInput, NearestOutput, QueryPoints,
+    PublishInput, PublishOutput, Project, ProjectStore, ProjectCurve, LatLonPoint,
+)
 
 API_ROOT_PATH = os.environ.get("API_ROOT_PATH", "/")
 API_ALLOWED_ORIGIN = os.environ.get("API_ALLOWED_ORIGIN", "http://localhost:3000")
+API_WARMUP = os.environ.get("API_WARMUP", "1") != "0"
 
 MAX_FILE_SIZE = 1 * 1024 * 1024
+MAX_TRACK_SIZE = 128 * 1024 * 1024
+MAX_TRACK_POINTS = 1_000_000
+IMPORT_DESIRED_DEGREE = 3  # same as the web app, so imported control points reproduce the fit
+MAX_IMPORT_CONTROL_POINTS = 10_000  # imported curves must fit into a project of MAX_FILE_SIZE
+# a cached curve takes about 100 bytes per sample once all derived data (curvature, speed,
+# global coordinates, search tree) is computed, so the cache holds at most about 50 MB per worker
+CURVE_CACHE_SAMPLES = 500_000  # total samples of all cached curves
+CURVE_CACHE_ENTRY_SAMPLES = 125_000  # larger curves are not cached
+MAX_STATIONS = 1_000_000
+SPEED_PERCENTILES = (5, 25, 50, 75, 95)
+EXPORT_DESIRED_DEGREE = 3  # same as the web app
+EXPORT_MAX_DISTANCE = 30.0  # same as the web app
 MAX_URL_LENGTH = 250
 PROJECT_STORE = os.path.join(os.path.dirname(__file__), "projects")
 
-app = FastAPI(title="MapLineDraw API", root_path=API_ROOT_PATH)
+WARMUP_CURVE = (
+    '{"control": {"lat": [48.2, 48.3, 48.25], "lon": [16.3, 16.4, 16.5]}, '
+    '"desired_degree": 3, "closed": false, "max_distance": 10.0}'
+)
+
+
+def warmup():
+    """Build the OpenAPI schema and run one curve computation including validation.
+
+    This moves one-time costs (lazy imports, schema generation, first-call overhead of the
+    numerical libraries) to server startup instead of the first request.
+    """
+    app.openapi()
+    data = CurveInput.model_validate_json(WARMUP_CURVE)
+    compute_curve(data).model_dump_json()
+    query = QueryPoints(lat=data.control.lat, lon=data.control.lon)
+    nearest_point(NearestInput(curves=[data], points=query)).model_dump_json()
+    CURVE_CACHE.clear()
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    """Warm up before serving requests (unless disabled with API_WARMUP=0)."""
+    if API_WARMUP:
+        warmup()
+    yield
+
+
+CURVE_CACHE = CurveCache(CURVE_CACHE_SAMPLES, CURVE_CACHE_ENTRY_SAMPLES)
+
+app = FastAPI(title="MapLineDraw API", root_path=API_ROOT_PATH, lifespan=lifespan)
 
 origins = [
     API_ALLOWED_ORIGIN,
@@ -42,45 +93,211 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-MAX_CURVATURE = 100.0
-MAX_SPEED = 1e4  # km/h
-
 if not os.path.isdir(PROJECT_STORE):
     os.makedirs(PROJECT_STORE)
 
 
-@app.post("/curve")
+@app.post("/curve", responses=err(400), response_model_exclude_unset=True)
 def compute_curve(data: CurveInput) -> CurveOutput:
-    """Compute B-spline curve."""
-    # pylint: disable=too-many-locals
-    lat = np.array(data.control.lat)
-    lon = np.array(data.control.lon)
-    alt = np.zeros_like(lat)
-    g = GlobePoint(lat, lon, alt)
+    """Compute B-spline curve.
+
+    The curve is sampled uniformly in the spline parameter, or at the given arc length stations if
+    station_interval or stations are specified. Only the requested fields are computed (all by
+    default, none if only the summary is requested).
+    """
+    curve = sampled_curve(data)
+    fields = data.fields
+    if fields is None:
+        fields = [] if data.summary else list(get_args(CurveField))
+    if not fields:
+        values = {}
+    elif data.station_interval is not None or data.stations is not None:
+        values = station_values(curve, station_distances(curve, data), fields)
+    else:
+        values = sample_values(curve, fields)
+    if data.summary:
+        values['summary'] = curve_summary(curve)
+    return CurveOutput(degree=curve.spline.degree, **values)
+
+
+def sample_values(curve: SampledCurve, fields: list[str]) -> dict:
+    """Requested output fields at the curve samples."""
+    getters = {
+        'lat': lambda: curve.globe.lat,
+        'lon': lambda: curve.globe.lon,
+        'distance': lambda: curve.distance,
+        'curvature': lambda: curve.curvature,
+        'speed': lambda: curve.speed,
+    }
+    return {field: getters[field]() for field in fields}
+
+
+def station_distances(curve: SampledCurve, data: CurveInput) -> np.ndarray:
+    """Arc lengths of the requested stations."""
+    if data.stations is not None:
+        s = np.array(data.stations, dtype=float)
+        if np.any(s < 0) or np.any(s > curve.length):
+            msg = f"Stations must be between 0 and the curve length ({curve.length} m)."
+            raise BadRequestError(msg)
+        return s
+    if curve.length / data.station_interval > MAX_STATIONS:
+        raise BadRequestError(f"At most {MAX_STATIONS} stations are supported.")
+    return curve.station_distances(data.station_interval)
+
+
+def station_values(curve: SampledCurve, s: np.ndarray, fields: list[str]) -> dict:
+    """Requested output fields at arc length stations s."""
+    values = {}
+    if 'lat' in fields or 'lon' in fields:
+        u = curve.at_distance(s)
+        g = curve.to_global(*curve.spline.evaluate(u))
+        values['lat'] = g.lat
+        values['lon'] = g.lon
+    if 'distance' in fields:
+        values['distance'] = s
+    if 'curvature' in fields:
+        values['curvature'] = np.interp(s, curve.distance, curve.curvature)
+    if 'speed' in fields:
+        values['speed'] = np.interp(s, curve.distance, curve.speed)
+    return {field: values[field] for field in fields}
+
+
+def curve_summary(curve: SampledCurve) -> CurveSummary:
+    """Summary of the whole curve (independent of the number of samples)."""
+    i = curve.min_radius_index
+    g = curve.to_global(curve.x[i], curve.y[i])
+    min_radius = curve.min_radius
+    percentiles = curve.speed_percentiles(SPEED_PERCENTILES)
+    return CurveSummary(
+        length=curve.length,
+        min_radius=min_radius if np.isfinite(min_radius) else None,
+        min_radius_distance=curve.distance[i],
+        min_radius_lat=g.lat,
+        min_radius_lon=g.lon,
+        max_speed=curve.max_speed,
+        speed_percentiles={str(q): v for q, v in zip(SPEED_PERCENTILES, percentiles)},
+    )
+
+
+@app.post("/curve/nearest")
+def nearest_point(data: NearestInput) -> NearestOutput:
+    """Find the nearest curve point (curve index, parameter, arc length, offset) to each point."""
+    n = len(data.points.lat)
+    best = {
+        'curve': np.zeros(n, dtype=int),
+        'u': np.zeros(n),
+        'distance': np.zeros(n),
+        'offset': np.full(n, np.inf),
+        'lat': np.zeros(n),
+        'lon': np.zeros(n),
+    }
+    for i, curve_input in enumerate(data.curves):
+        curve = sampled_curve(curve_input)
+        p = curve.to_cartesian(data.points.lat, data.points.lon)
+        u, s, d = curve.nearest(p.x, p.y)
+        mask = d < best['offset']
+        if not mask.any():
+            continue
+        g = curve.to_global(*curve.spline.evaluate(u[mask]))
+        best['curve'][mask] = i
+        best['u'][mask] = u[mask]
+        best['distance'][mask] = s[mask]
+        best['offset'][mask] = d[mask]
+        best['lat'][mask] = g.lat
+        best['lon'][mask] = g.lon
+    return NearestOutput(**best)
+
+
+def sampled_curve(data: CurveInput) -> SampledCurve:
+    """Sampled curve for curve inputs (cached)."""
+    return _sampled_curve(
+        tuple(data.control.lat), tuple(data.control.lon), data.desired_degree, data.closed,
+        data.max_distance,
+    )
+
+
+def _sampled_curve(
+    lat: tuple[float, ...], lon: tuple[float, ...], desired_degree: int, closed: bool,
+    max_distance: float, store: bool = True,
+) -> SampledCurve:
+    """Create sampled curve (cached by its inputs, only added to the cache if store is set)."""
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    key = (lat, lon, desired_degree, closed, max_distance)
+    curve = CURVE_CACHE.get(key)
+    if curve is None:
+        curve = SampledCurve.create(lat, lon, desired_degree, closed, max_distance)
+        if store:
+            CURVE_CACHE.put(key, curve)
+    return curve
+
+
+@app.post("/import", responses=err(400))
+async def import_track(
+    file: UploadFile,
+    name: str = "",
+    closed: bool = False,
+    control_points: Annotated[int | None, Query(ge=2, le=MAX_IMPORT_CONTROL_POINTS)] = None,
+    tolerance: Annotated[float | None, Query(gt=0)] = None,
+) -> ProjectCurve:
+    """Fit a curve to a dense GPS track (GPX or GeoJSON).
+
+    Either the number of control points or the tolerance (maximum deviation in meters) must be
+    given.
+    """
+    if (control_points is None) == (tolerance is None):
+        raise BadRequestError("Specify either control_points or tolerance.")
+
+    data = bytearray()
+    while chunk := await file.read(1024 * 1024):
+        data.extend(chunk)
+        if len(data) > MAX_TRACK_SIZE:
+            msg = (
+                f"Files larger than {MAX_TRACK_SIZE/(1024**2)} MB are not supported. "
+                "Use a smaller track file."
+            )
+            raise BadRequestError(msg)
+
+    try:
+        return await run_in_threadpool(
+            import_curve, data, file.filename, name, closed, control_points, tolerance
+        )
+    except ValueError as e:
+        raise BadRequestError(f"The track cannot be imported: {e}.") from e
+
+
+def import_curve(
+    data: bytearray, filename: str | None, name: str, closed: bool,
+    control_points: int | None = None, tolerance: float | None = None,
+) -> ProjectCurve:
+    """Read a track file and fit a B-spline to it."""
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    g = read_track(data, filename)
+    if len(g.lat) > MAX_TRACK_POINTS:
+        raise ValueError(f"tracks with more than {MAX_TRACK_POINTS} points are not supported")
+    return fit_track(g, name, closed, control_points, tolerance)
+
+
+def fit_track(
+    g: GlobePoint, name: str, closed: bool, control_points: int | None = None,
+    tolerance: float | None = None,
+) -> ProjectCurve:
+    """Fit a B-spline to a track and return it as project curve."""
     lat_ref = g.lat[0]
     lon_ref = g.lon[0]
     p = g.to_cartesian(lat_ref=lat_ref, lon_ref=lon_ref)
-    control_points = [(p.x[i], p.y[i]) for i in range(len(p.x))]
-    max_distance = data.max_distance
-    spline = BSpline.create(control_points, data.desired_degree, closed=data.closed)
-    x_s, y_s = spline.evaluate_auto(max_distance=max_distance)
-    c = curvature(x_s, y_s, closed=data.closed)
-    c[np.isnan(c)] = MAX_CURVATURE
-    c[c == np.inf] = MAX_CURVATURE
-    c[c == -np.inf] = -MAX_CURVATURE
-    v = speed(c, 1.73) * 3.6
-    v[v == np.inf] = MAX_SPEED
-    z_s = np.zeros_like(x_s)
-    ps = Point(x_s, y_s, z_s)
-    gs = ps.to_global(lat_ref=lat_ref, lon_ref=lon_ref)
-    return CurveOutput(
-        degree=spline.degree,
-        lat=gs.lat,
-        lon=gs.lon,
-        distance=arclen(x_s, y_s),
-        curvature=c,
-        speed=v,
-    )
+    if control_points is not None:
+        spline = fit(p.x, p.y, control_points, IMPORT_DESIRED_DEGREE, closed=closed)
+    else:
+        spline = fit_tolerance(
+            p.x, p.y, tolerance, IMPORT_DESIRED_DEGREE, closed=closed,
+            max_control=MAX_IMPORT_CONTROL_POINTS,
+        )
+    cp = spline.control
+    if closed:
+        cp = cp[:len(cp) - spline.degree]
+    gc = Point(cp[:, 0], cp[:, 1], np.zeros(len(cp))).to_global(lat_ref=lat_ref, lon_ref=lon_ref)
+    points = [LatLonPoint(lat=lat, lon=lon) for lat, lon in zip(gc.lat, gc.lon)]
+    return ProjectCurve(name=name, controlPoints=points, closed=closed)
 
 
 @app.post("/publish", responses=err(404, 400))
@@ -109,10 +326,48 @@ async def publish_project(data: PublishInput) -> PublishOutput:
     return PublishOutput(id=id)
 
 
-@app.get("/projects/{id}", responses=err(404, 400))
-async def get_project(id: str) -> Project:
+@app.get("/projects/{id}", response_model=Project, responses=err(404, 400))
+async def get_project(id: str) -> Response:
     """Get a shared project as JSON."""
     # pylint: disable=redefined-builtin
+    project = await load_shared_project(id)
+    return Response(project.to_json(), media_type="application/json")
+
+
+@app.get(
+    "/projects/{id}/export.{format}",
+    responses=err(404, 400),
+    response_class=StreamingResponse,
+)
+async def export_project(id: str, format: Literal['geojson', 'kml', 'gpx']) -> StreamingResponse:
+    """Export the computed curves of a shared project as GeoJSON, KML or GPX."""
+    # pylint: disable=redefined-builtin
+    project = await load_shared_project(id)
+    items = (
+        (curve.name, project_curve(curve))
+        for curve in project.curves if len(curve.lat) >= 2
+    )
+    headers = {"Content-Disposition": f'attachment; filename="{id}.{format}"'}
+    return StreamingResponse(
+        export(format, project.info.name, items), media_type=MEDIA_TYPES[format], headers=headers
+    )
+
+
+def project_curve(curve: ColumnarCurve) -> SampledCurve:
+    """Sampled curve of a project curve using the settings of the web app.
+
+    Cached curves are reused, but new curves are not added to the cache, so that exports do not
+    keep the curves of whole projects in memory.
+    """
+    return _sampled_curve(
+        tuple(curve.lat.tolist()), tuple(curve.lon.tolist()), EXPORT_DESIRED_DEGREE, curve.closed,
+        EXPORT_MAX_DISTANCE, store=False,
+    )
+
+
+async def load_shared_project(id: str) -> ColumnarProject:
+    """Load a shared project by its id."""
+    # pylint: disable=redefined-builtin
 
     # Get stored URL
     not_found_message = "Project not found."
@@ -131,22 +386,17 @@ async def get_project(id: str) -> Project:
     return project
 
 
-async def download_project(url: HttpUrl) -> Project:
+async def download_project(url: HttpUrl) -> ColumnarProject:
     """Download from URL and parse project JSON."""
     # Download file from URL or fail if source file cannot be downloaded or is too large
     data = await download_file(url, MAX_FILE_SIZE)
 
-    # Parse JSON
+    # Parse and validate JSON schema
     try:
-        text = data.decode('utf-8')
-        json_data = json.loads(text)
-    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        project = ColumnarProject.from_json(data)
+    except ProjectJsonError as e:
         raise BadRequestError("The project file content is not valid JSON.") from e
-
-    # Validate JSON schema
-    try:
-        project = Project.model_validate(json_data)
-    except ValidationError as e:
+    except ProjectSchemaError as e:
         msg = "The project file does not respect the MapLineDraw project JSON schema."
         raise BadRequestError(msg) from e
 
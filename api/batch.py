@@ -0,0 +1,99 @@
+"""Offline batch analysis of project files.
+
+Reads projects from a directory of JSON files or from a JSONL file, computes all curves on a
+process pool and writes one result row per curve (length, minimum radius, maximum speed) to an
+NDJSON or Parquet file. Work is distributed in chunks and only a bounded number of chunks is in
+flight at any time, so memory stays bounded for any number of projects.
+
+Usage: python batch.py INPUT OUTPUT [--workers N] [--chunk-size N] [--profile]
+"""
+import os
+import sys
+import time
+import argparse
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+from lib.batch import (
+    iter_sources, analyze_chunk, NdjsonWriter, ParquetWriter, DESIRED_DEGREE, MAX_DISTANCE,
+)
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Analyze MapLineDraw project files in bulk.")
+    parser.add_argument("input", help="directory of project JSON files or JSONL file")
+    parser.add_argument("output", help="output file (.ndjson/.jsonl or .parquet)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=16, help="projects per work unit")
+    parser.add_argument("--desired-degree", type=int, default=DESIRED_DEGREE)
+    parser.add_argument("--max-distance", type=float, default=MAX_DISTANCE)
+    parser.add_argument(
+        "--profile", action="store_true", help="include distance and speed profiles"
+    )
+    return parser.parse_args()
+
+
+def chunks(iterable, size: int):
+    """Split iterable into lists of at most size items."""
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def main():
+    """Run batch analysis."""
+    # pylint: disable=too-many-locals
+    args = parse_args()
+    if args.output.endswith('.parquet'):
+        try:
+            writer = ParquetWriter(args.output, profile=args.profile)
+        except RuntimeError as e:
+            sys.exit(str(e))
+    else:
+        writer = NdjsonWriter(args.output)
+
+    start = time.perf_counter()
+    n_projects = n_curves = n_errors = 0
+    max_pending = 2 * max(args.workers, 1)
+    work = chunks(iter_sources(args.input), max(args.chunk_size, 1))
+    options = (args.desired_degree, args.max_distance, args.profile)
+
+    with ProcessPoolExecutor(max_workers=max(args.workers, 1)) as executor:
+        pending = {}
+        try:
+            while True:
+                for chunk in islice(work, max_pending - len(pending)):
+                    pending[executor.submit(analyze_chunk, chunk, *options)] = len(chunk)
+                if not pending:
+                    break
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    n_projects += pending.pop(future)
+                    rows = future.result()
+                    writer.write(rows)
+                    n_curves += sum(1 for row in rows if row['length'] is not None)
+                    n_errors += sum(1 for row in rows if row['error'] is not None)
+                elapsed = time.perf_counter() - start
+                print(
+                    f"\r{n_projects} projects, {n_curves} curves, {elapsed:.1f} s",
+                    end="", file=sys.stderr, flush=True,
+                )
+        finally:
+            writer.close()
+
+    elapsed = time.perf_counter() - start
+    print(file=sys.stderr)
+    print(f"Projects: {n_projects}", file=sys.stderr)
+    print(f"Curves: {n_curves}", file=sys.stderr)
+    print(f"Errors: {n_errors}", file=sys.stderr)
+    print(f"Time: {elapsed:.2f} s", file=sys.stderr)
+    if elapsed > 0:
+        print(
+            f"Throughput: {n_projects / elapsed:.1f} projects/s, {n_curves / elapsed:.1f} curves/s",
+            file=sys.stderr,
+        )
+
+
+if __name__ == "__main__":
+    main()
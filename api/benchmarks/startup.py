@@ -0,0 +1,109 @@
+"""Benchmark time to first response of the API server.
+
+Starts the server as a subprocess and measures the time until the first /curve request succeeds,
+as well as the duration of that first request. Modes: serve (warmed up, preforked workers),
+uvicorn (single process with lifespan warmup) and cold (single process without warmup).
+
+Usage: python benchmarks/startup.py [--mode serve|uvicorn|cold] [--runs N] [--workers N]
+"""
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import subprocess
+import urllib.request
+import urllib.error
+
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CURVE = {
+    "control": {"lat": [48.2, 48.3, 48.25, 48.1], "lon": [16.3, 16.4, 16.5, 16.6]},
+    "desired_degree": 3,
+    "closed": False,
+    "max_distance": 10.0,
+}
+
+
+def free_port() -> int:
+    """Find a free TCP port."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def command(mode: str, port: int, workers: int) -> list[str]:
+    """Server command line."""
+    if mode in ("uvicorn", "cold"):
+        return [sys.executable, "-m", "uvicorn", "api:app", "--port", str(port)]
+    return [
+        sys.executable, "serve.py", "--host", "127.0.0.1", "--port", str(port),
+        "--workers", str(workers),
+    ]
+
+
+def post_curve(port: int) -> bool:
+    """Send one /curve request, return whether it succeeded."""
+    request = urllib.request.Request(
+        f"http://127.0.0.1:{port}/curve",
+        data=json.dumps(CURVE).encode(),
+        headers={"Content-Type": "application/json"},
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=30) as response:
+            return response.status == 200
+    except (urllib.error.URLError, ConnectionError):
+        return False
+
+
+def check_running(process: subprocess.Popen):
+    """Fail if the server process has exited."""
+    if process.poll() is not None:
+        raise RuntimeError(f"server exited with code {process.returncode}")
+
+
+def run(mode: str, workers: int) -> tuple[float, float]:
+    """Measure time to first response and duration of the first request."""
+    port = free_port()
+    env = dict(os.environ, API_WARMUP="0" if mode == "cold" else "1")
+    start = time.perf_counter()
+    with subprocess.Popen(
+        command(mode, port, workers), cwd=API_DIR, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    ) as process:
+        try:
+            while True:
+                with socket.socket() as sock:
+                    if sock.connect_ex(("127.0.0.1", port)) == 0:
+                        break
+                check_running(process)
+                time.sleep(0.01)
+            request_start = time.perf_counter()
+            while not post_curve(port):
+                check_running(process)
+                time.sleep(0.01)
+            end = time.perf_counter()
+        finally:
+            process.terminate()
+            process.wait()
+    return end - start, end - request_start
+
+
+def main():
+    """Run benchmark and print results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mode", choices=["serve", "uvicorn", "cold"], default="serve")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+
+    results = [run(args.mode, args.workers) for _ in range(args.runs)]
+    total = sorted(r[0] for r in results)
+    first = sorted(r[1] for r in results)
+    print(f"mode: {args.mode}, runs: {args.runs}")
+    print(f"time to first response: median {total[len(total) // 2]:.3f} s, min {total[0]:.3f} s")
+    print(f"first request duration: median {first[len(first) // 2]:.3f} s, min {first[0]:.3f} s")
+
+
+if __name__ == "__main__":
+    main()
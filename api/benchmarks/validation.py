@@ -0,0 +1,79 @@
+"""Benchmark project validation: `Project` model path versus columnar fast path.
+
+Generates a synthetic project of about the maximum supported file size and measures parsing and
+validation (and serialization for the response) with both implementations.
+
+Usage: python benchmarks/validation.py [--points N] [--curves N] [--runs N]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lib.types import Project  # noqa: E402 pylint: disable=wrong-import-position
+from lib.project import ColumnarProject  # noqa: E402 pylint: disable=wrong-import-position
+
+
+def synthetic_project(n_curves: int, n_points: int) -> bytes:
+    """Project JSON with n_curves curves of n_points random control points each."""
+    rng = np.random.default_rng(0)
+    curves = []
+    for i in range(n_curves):
+        lat = 47 + rng.random(n_points)
+        lon = 13 + rng.random(n_points)
+        points = [{"lat": a, "lon": b} for a, b in zip(lat.tolist(), lon.tolist())]
+        curves.append({"name": f"Curve {i}", "controlPoints": points, "closed": False})
+    project = {
+        "info": {"name": "Benchmark", "description": "", "author": ""},
+        "curves": curves,
+        "colorMaps": [],
+        "settings": {
+            "selectedColorMapIndex": 0,
+            "map": {"center": {"lat": 47.5, "lon": 13.5}, "zoom": 8, "background": "osm"},
+        },
+    }
+    return json.dumps(project).encode()
+
+
+def model_path(data: bytes) -> bytes:
+    """Current path: json.loads, Project.model_validate, model_dump_json."""
+    project = Project.model_validate(json.loads(data.decode('utf-8')))
+    return project.model_dump_json().encode()
+
+
+def columnar_path(data: bytes) -> bytes:
+    """Fast path: ColumnarProject.from_json, to_json."""
+    return ColumnarProject.from_json(data).to_json()
+
+
+def measure(func, data: bytes, runs: int) -> float:
+    """Median run time in seconds."""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func(data)
+        times.append(time.perf_counter() - start)
+    return sorted(times)[len(times) // 2]
+
+
+def main():
+    """Run benchmark and print results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--curves", type=int, default=20)
+    parser.add_argument("--points", type=int, default=1000)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    data = synthetic_project(args.curves, args.points)
+    assert model_path(data) == columnar_path(data), "outputs differ"
+    print(f"project size: {len(data) / 1024**2:.2f} MB, {args.curves * args.points} points")
+    for name, func in (("model", model_path), ("columnar", columnar_path)):
+        print(f"{name}: {measure(func, data, args.runs) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
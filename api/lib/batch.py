@@ -0,0 +1,161 @@
+"""Offline batch analysis of project files."""
+import os
+import json
+import math
+from collections.abc import Iterator
+from .curve import SampledCurve
+from .project import ColumnarProject, ProjectSchemaError
+
+DESIRED_DEGREE = 3
+MAX_DISTANCE = 30.0  # same as the web app
+
+RESULT_FIELDS = (
+    'source', 'project', 'curve', 'name', 'closed', 'control_points', 'length', 'min_radius',
+    'max_speed', 'error',
+)
+
+
+def iter_sources(path: str) -> Iterator[tuple[str, str | None]]:
+    """Iterate over project sources as (source, text) pairs.
+
+    For a directory, all *.json files are yielded by file path and text is None (files are read by
+    the worker). For a JSONL file, each non-empty line is yielded as (file:line, text); invalid
+    UTF-8 is replaced, so such lines fail validation instead of stopping the iteration.
+    """
+    if os.path.isdir(path):
+        with os.scandir(path) as entries:
+            names = sorted(e.name for e in entries if e.is_file() and e.name.endswith('.json'))
+        for name in names:
+            yield os.path.join(path, name), None
+    else:
+        with open(path, 'r', encoding='utf8', errors='replace') as f:
+            for i, line in enumerate(f, start=1):
+                if line.strip():
+                    yield f'{path}:{i}', line
+
+
+def analyze_project(
+    source: str, text: str | bytes | None, desired_degree: int = DESIRED_DEGREE,
+    max_distance: float = MAX_DISTANCE, profile: bool = False,
+) -> list[dict]:
+    """Validate a project and compute all its curves.
+
+    Returns one result row per curve, or a single row with an error message if the project is
+    invalid. Errors never propagate, so one malformed project cannot abort a batch run.
+    """
+    # pylint: disable=broad-exception-caught
+    try:
+        if text is None:
+            with open(source, 'rb') as f:
+                text = f.read()
+        project = ColumnarProject.from_json(text)
+    except Exception as e:
+        return [_row(source, error=_error_message(e))]
+
+    rows = []
+    for i, curve in enumerate(project.curves):
+        row = _row(
+            source, project=project.info.name, curve=i, name=curve.name, closed=curve.closed,
+            control_points=len(curve.lat),
+        )
+        if len(curve.lat) < 2:
+            row['error'] = "curve has less than 2 control points"
+            rows.append(row)
+            continue
+        try:
+            sampled = SampledCurve.create(
+                curve.lat, curve.lon, desired_degree, curve.closed, max_distance
+            )
+            values = {
+                'length': sampled.length,
+                'min_radius': _finite(sampled.min_radius),
+                'max_speed': sampled.max_speed,
+            }
+            if profile:
+                values['distance'] = sampled.distance.tolist()
+                values['speed'] = sampled.speed.tolist()
+        except Exception as e:
+            row['error'] = _error_message(e)
+            rows.append(row)
+            continue
+        row.update(values)
+        rows.append(row)
+    return rows
+
+
+def analyze_chunk(
+    chunk: list[tuple[str, str | None]], desired_degree: int, max_distance: float, profile: bool
+) -> list[dict]:
+    """Analyze a chunk of project sources (unit of work of a worker process)."""
+    rows = []
+    for source, text in chunk:
+        rows.extend(analyze_project(source, text, desired_degree, max_distance, profile))
+    return rows
+
+
+def _row(source: str, **values) -> dict:
+    """Result row with all fields."""
+    row = dict.fromkeys(RESULT_FIELDS)
+    row['source'] = source
+    row.update(values)
+    return row
+
+
+def _finite(value: float) -> float | None:
+    """Replace infinite values (e.g. radius of straight lines) by None."""
+    return value if math.isfinite(value) else None
+
+
+def _error_message(e: Exception) -> str:
+    """Short error message for result rows."""
+    if isinstance(e, ProjectSchemaError):
+        return "The project file does not respect the MapLineDraw project JSON schema."
+    return str(e) or type(e).__name__
+
+
+class NdjsonWriter:
+    """Writes result rows as newline-delimited JSON."""
+
+    def __init__(self, path: str):
+        self.file = open(path, 'w', encoding='utf8')  # pylint: disable=consider-using-with
+
+    def write(self, rows: list[dict]):
+        """Write rows."""
+        for row in rows:
+            self.file.write(json.dumps(row, ensure_ascii=False) + '\n')
+
+    def close(self):
+        """Close output file."""
+        self.file.close()
+
+
+class ParquetWriter:
+    """Writes result rows to a Parquet file (one row group per write, requires pyarrow)."""
+
+    def __init__(self, path: str, profile: bool = False):
+        # pylint: disable=import-outside-toplevel
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise RuntimeError("Parquet output requires pyarrow (pip install pyarrow).") from e
+        fields = [
+            ('source', pa.string()), ('project', pa.string()), ('curve', pa.int64()),
+            ('name', pa.string()), ('closed', pa.bool_()), ('control_points', pa.int64()),
+            ('length', pa.float64()), ('min_radius', pa.float64()), ('max_speed', pa.float64()),
+            ('error', pa.string()),
+        ]
+        if profile:
+            fields += [('distance', pa.list_(pa.float64())), ('speed', pa.list_(pa.float64()))]
+        self.pa = pa
+        self.schema = pa.schema(fields)
+        self.writer = pq.ParquetWriter(path, self.schema)
+
+    def write(self, rows: list[dict]):
+        """Write rows."""
+        if rows:
+            self.writer.write_table(self.pa.Table.from_pylist(rows, schema=self.schema))
+
+    def close(self):
+        """Close output file."""
+        self.writer.close()
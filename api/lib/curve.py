@@ -0,0 +1,222 @@
+"""Sampled B-spline curves on the globe."""
+from collections import OrderedDict
+from collections.abc import Hashable
+from dataclasses import dataclass, field
+from functools import cached_property
+from threading import Lock
+import numpy as np
+from numpy import ndarray
+from scipy.spatial import cKDTree
+from .globe import GlobePoint, Point
+from .spline import BSpline
+from .geo import arclen, curvature, speed
+
+MAX_CURVATURE = 100.0
+MIN_CURVATURE = 1e-7  # smaller curvatures (radius above 10000 km) are treated as straight [1/m]
+MAX_SPEED = 1e4  # km/h
+LATERAL_ACCELERATION = 1.73  # m/s^2
+NEWTON_ITERATIONS = 8
+
+
+@dataclass
+class SampledCurve:
+    """B-spline curve through control points on the globe, sampled in local Cartesian coordinates.
+
+    Derived data (curvature, speed, global coordinates, search tree) is computed on first use, so
+    instances can be cached and reused between requests.
+    """
+
+    spline: BSpline
+    closed: bool
+    lat_ref: float
+    lon_ref: float
+    x: ndarray = field(repr=False)
+    y: ndarray = field(repr=False)
+
+    @staticmethod
+    def create(
+        lat: list[float], lon: list[float], desired_degree: int, closed: bool, max_distance: float
+    ) -> 'SampledCurve':
+        """Create curve from control points and sample it with at most max_distance spacing."""
+        lat = np.array(lat)
+        lon = np.array(lon)
+        g = GlobePoint(lat, lon, np.zeros_like(lat))
+        lat_ref = g.lat[0]
+        lon_ref = g.lon[0]
+        p = g.to_cartesian(lat_ref=lat_ref, lon_ref=lon_ref)
+        control_points = [(p.x[i], p.y[i]) for i in range(len(p.x))]
+        spline = BSpline.create(control_points, desired_degree, closed=closed)
+        x_s, y_s = spline.evaluate_auto(max_distance=max_distance)
+        return SampledCurve(
+            spline=spline, closed=closed, lat_ref=lat_ref, lon_ref=lon_ref, x=x_s, y=y_s
+        )
+
+    @cached_property
+    def u(self) -> ndarray:
+        """Spline parameter of the samples."""
+        return self.spline.uniform_u(points=len(self.x))
+
+    @cached_property
+    def distance(self) -> ndarray:
+        """Cumulative arc length of the samples [m]."""
+        return arclen(self.x, self.y)
+
+    @cached_property
+    def curvature(self) -> ndarray:
+        """Curvature of the samples [1/m], limited to MAX_CURVATURE."""
+        c = curvature(self.x, self.y, closed=self.closed)
+        c[np.isnan(c)] = MAX_CURVATURE
+        c[c == np.inf] = MAX_CURVATURE
+        c[c == -np.inf] = -MAX_CURVATURE
+        return c
+
+    @cached_property
+    def speed(self) -> ndarray:
+        """Maximum speed of the samples [km/h], limited to MAX_SPEED."""
+        with np.errstate(divide='ignore'):
+            v = speed(self.curvature, LATERAL_ACCELERATION) * 3.6
+        return np.minimum(v, MAX_SPEED)
+
+    @property
+    def arclen_table(self) -> tuple[ndarray, ndarray]:
+        """Arc length table (u, s) of the samples."""
+        return self.u, self.distance
+
+    def at_distance(self, s: ndarray) -> ndarray:
+        """Spline parameter u at arc lengths s [m]."""
+        return self.spline.invert_arclen(s, self.arclen_table)
+
+    def station_distances(self, interval: float) -> ndarray:
+        """Arc lengths of stations every interval meters, including the curve end."""
+        s = np.arange(0, self.length, interval)
+        if len(s) == 0 or s[-1] < self.length:
+            s = np.append(s, self.length)
+        return s
+
+    @property
+    def length(self) -> float:
+        """Total length of the curve [m]."""
+        return float(self.distance[-1])
+
+    @cached_property
+    def min_radius_index(self) -> int:
+        """Index of the sample with the minimum radius."""
+        return int(np.argmax(np.abs(self.curvature)))
+
+    @property
+    def min_radius(self) -> float:
+        """Minimum radius of the curve [m] (infinite for straight lines)."""
+        c = abs(float(self.curvature[self.min_radius_index]))
+        return 1 / c if c >= MIN_CURVATURE else np.inf
+
+    @property
+    def max_speed(self) -> float:
+        """Maximum speed on the whole curve, limited by the minimum radius [km/h]."""
+        return float(self.speed[self.min_radius_index])
+
+    def speed_percentiles(self, q) -> ndarray:
+        """Percentiles q (0 to 100) of the speed along the curve, weighted by distance [km/h]."""
+        ds = np.diff(self.distance) / 2
+        weights = np.concatenate((ds, [0.0])) + np.concatenate(([0.0], ds))
+        if weights.sum() <= 0:
+            weights = np.ones_like(weights)
+        order = np.argsort(self.speed)
+        cumulative = np.cumsum(weights[order])
+        return np.interp(np.asarray(q) / 100 * cumulative[-1], cumulative, self.speed[order])
+
+    @cached_property
+    def globe(self) -> GlobePoint:
+        """Samples in global coordinates."""
+        return self.to_global(self.x, self.y)
+
+    @cached_property
+    def tree(self) -> cKDTree:
+        """Search tree over the samples."""
+        return cKDTree(np.column_stack((self.x, self.y)))
+
+    def to_cartesian(self, lat, lon) -> Point:
+        """Convert global coordinates to the local Cartesian coordinates of the curve."""
+        lat = np.asarray(lat, dtype=float)
+        lon = np.asarray(lon, dtype=float)
+        g = GlobePoint(lat, lon, np.zeros_like(lat))
+        return g.to_cartesian(lat_ref=self.lat_ref, lon_ref=self.lon_ref)
+
+    def to_global(self, x, y) -> GlobePoint:
+        """Convert local Cartesian coordinates of the curve to global coordinates."""
+        p = Point(x, y, np.zeros_like(x))
+        return p.to_global(lat_ref=self.lat_ref, lon_ref=self.lon_ref)
+
+    def nearest(self, x: ndarray, y: ndarray) -> tuple[ndarray, ndarray, ndarray]:
+        """Nearest points on the curve to the points (x, y).
+
+        The nearest sample is found with the search tree and the spline parameter is then refined
+        with Newton iteration on the squared distance.
+
+        :returns: spline parameter u, arc length and distance of the nearest points
+        """
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        _, index = self.tree.query(np.column_stack((x, y)))
+        u = self.u[index]
+        u_start, u_end = self.spline.domain
+        for _ in range(NEWTON_ITERATIONS):
+            x_s, y_s = self.spline.evaluate(u)
+            dx_s, dy_s = self.spline.evaluate(u, der=1)
+            ddx_s, ddy_s = self.spline.evaluate(u, der=2)
+            ex = x_s - x
+            ey = y_s - y
+            grad = ex * dx_s + ey * dy_s
+            hess = dx_s ** 2 + dy_s ** 2 + ex * ddx_s + ey * ddy_s
+            step = np.where(hess > 0, grad / np.where(hess > 0, hess, 1.0), 0.0)
+            u = u - step
+            if self.closed:
+                u = u_start + np.mod(u - u_start, u_end - u_start)
+            else:
+                u = np.clip(u, u_start, u_end)
+        x_s, y_s = self.spline.evaluate(u)
+        s = np.interp(u, self.u, self.distance)
+        d = np.hypot(x_s - x, y_s - y)
+        return u, s, d
+
+
+class CurveCache:
+    """LRU cache of sampled curves, bounded by the total number of samples.
+
+    Curves with more than max_entry_samples samples are not cached at all, so a single large
+    curve cannot evict all other entries.
+    """
+
+    def __init__(self, max_samples: int, max_entry_samples: int):
+        self.max_samples = max_samples
+        self.max_entry_samples = max_entry_samples
+        self.samples = 0
+        self._entries: OrderedDict[Hashable, SampledCurve] = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: Hashable) -> SampledCurve | None:
+        """Cached curve or None."""
+        with self._lock:
+            curve = self._entries.get(key)
+            if curve is not None:
+                self._entries.move_to_end(key)
+            return curve
+
+    def put(self, key: Hashable, curve: SampledCurve):
+        """Add curve to cache, evicting least recently used curves if necessary."""
+        n = len(curve.x)
+        if n > self.max_entry_samples:
+            return
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = curve
+            self.samples += n
+            while self.samples > self.max_samples:
+                _, evicted = self._entries.popitem(last=False)
+                self.samples -= len(evicted.x)
+
+    def clear(self):
+        """Remove all curves."""
+        with self._lock:
+            self._entries.clear()
+            self.samples = 0
@@ -0,0 +1,101 @@
+"""Export of computed curves to GeoJSON, KML and GPX.
+
+All exporters are generators that yield the document in pieces, one curve (or a block of
+coordinates) at a time, so that large projects can be streamed with constant memory.
+"""
+import json
+import math
+from collections.abc import Iterable, Iterator
+from xml.sax.saxutils import escape
+from .curve import SampledCurve
+
+MEDIA_TYPES = {
+    'geojson': 'application/geo+json',
+    'kml': 'application/vnd.google-earth.kml+xml',
+    'gpx': 'application/gpx+xml',
+}
+BLOCK_SIZE = 10000  # coordinates per yielded piece
+
+ExportItems = Iterable[tuple[str, SampledCurve]]
+
+
+def properties(name: str, curve: SampledCurve) -> dict:
+    """Feature properties of a curve (radius of straight curves is None)."""
+    min_radius = curve.min_radius
+    return {
+        'name': name,
+        'closed': curve.closed,
+        'length': curve.length,
+        'min_radius': min_radius if math.isfinite(min_radius) else None,
+        'max_speed': curve.max_speed,
+    }
+
+
+def export(fmt: str, title: str, items: ExportItems) -> Iterator[str]:
+    """Export curves (pairs of name and sampled curve) in the given format."""
+    exporters = {'geojson': geojson, 'kml': kml, 'gpx': gpx}
+    return exporters[fmt](title, items)
+
+
+def geojson(title: str, items: ExportItems) -> Iterator[str]:
+    """Export curves as GeoJSON FeatureCollection of LineStrings."""
+    yield '{"type": "FeatureCollection", "name": ' + json.dumps(title) + ', "features": ['
+    for i, (name, curve) in enumerate(items):
+        props = json.dumps(properties(name, curve))
+        prefix = ',\n' if i > 0 else '\n'
+        yield prefix + '{"type": "Feature", "properties": ' + props
+        yield ', "geometry": {"type": "LineString", "coordinates": ['
+        for j, (lat, lon) in enumerate(_blocks(curve)):
+            separator = ', ' if j > 0 else ''
+            yield separator + ', '.join(f'[{x!r}, {y!r}]' for x, y in zip(lon, lat))
+        yield ']}}'
+    yield '\n]}\n'
+
+
+def kml(title: str, items: ExportItems) -> Iterator[str]:
+    """Export curves as KML placemarks with extended data."""
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield '<kml xmlns="http://www.opengis.net/kml/2.2">\n<Document>\n'
+    yield f'<name>{escape(title)}</name>\n'
+    for name, curve in items:
+        yield f'<Placemark>\n<name>{escape(name)}</name>\n<ExtendedData>\n'
+        for key, value in properties(name, curve).items():
+            if key != 'name':
+                yield f'<Data name="{key}"><value>{escape(_text(value))}</value></Data>\n'
+        yield '</ExtendedData>\n<LineString>\n<tessellate>1</tessellate>\n<coordinates>\n'
+        for lat, lon in _blocks(curve):
+            yield ''.join(f'{x!r},{y!r}\n' for x, y in zip(lon, lat))
+        yield '</coordinates>\n</LineString>\n</Placemark>\n'
+    yield '</Document>\n</kml>\n'
+
+
+def gpx(title: str, items: ExportItems) -> Iterator[str]:
+    """Export curves as GPX tracks (properties are given in the track description)."""
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield '<gpx version="1.1" creator="MapLineDraw" xmlns="http://www.topografix.com/GPX/1/1">\n'
+    yield f'<metadata><name>{escape(title)}</name></metadata>\n'
+    for name, curve in items:
+        props = properties(name, curve)
+        desc = ', '.join(f'{k}: {_text(v)}' for k, v in props.items() if k != 'name')
+        yield f'<trk>\n<name>{escape(name)}</name>\n<desc>{escape(desc)}</desc>\n<trkseg>\n'
+        for lat, lon in _blocks(curve):
+            yield ''.join(f'<trkpt lat="{y!r}" lon="{x!r}"/>\n' for x, y in zip(lon, lat))
+        yield '</trkseg>\n</trk>\n'
+    yield '</gpx>\n'
+
+
+def _blocks(curve: SampledCurve) -> Iterator[tuple[list[float], list[float]]]:
+    """Global coordinates of the curve samples in blocks of (lat, lon) lists."""
+    g = curve.globe
+    for start in range(0, len(g.lat), BLOCK_SIZE):
+        end = start + BLOCK_SIZE
+        yield g.lat[start:end].tolist(), g.lon[start:end].tolist()
+
+
+def _text(value) -> str:
+    """Text representation of a property value."""
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return str(value).lower()
+    return str(value)
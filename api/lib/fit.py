@@ -0,0 +1,131 @@
+"""Least-squares fitting of B-splines to dense tracks."""
+import numpy as np
+from numpy import ndarray
+from scipy import sparse
+from scipy.interpolate import BSpline as _ScipyBSpline
+from scipy.linalg import solveh_banded, LinAlgError
+from scipy.sparse.linalg import spsolve
+from .spline import BSpline
+from .geo import arclen
+
+
+def chord_parameters(
+    x: ndarray, y: ndarray, domain: tuple[float, float], closed=False
+) -> ndarray:
+    """Chord-length parametrization of points (x, y) mapped onto the spline domain.
+
+    For closed curves, the closing chord from the last back to the first point is part of the
+    total length, so the last point only reaches the domain end if it repeats the first point.
+    """
+    s = arclen(x, y)
+    total = s[-1]
+    if closed:
+        total += np.hypot(x[0] - x[-1], y[0] - y[-1])
+    if total <= 0:
+        raise ValueError("track must have a non-zero length")
+    u_start, u_end = domain
+    u = u_start + (u_end - u_start) * s / total
+    if not closed:
+        u[-1] = u_end
+    return np.clip(u, u_start, u_end)  # avoid round-off outside of the domain
+
+
+def fit(x: ndarray, y: ndarray, n_control: int, desired_degree: int, closed=False) -> BSpline:
+    """Fit a B-spline with n_control control points to points (x, y) in the least-squares sense.
+
+    The spline uses the same uniform knot vector as `BSpline.create()`, so the fitted control
+    points reproduce the fitted curve when used as input for curve computation.
+
+    The normal equations are banded (cyclic banded for closed curves), so the fit runs in linear
+    time with respect to the number of track points.
+    """
+    # pylint: disable=too-many-locals
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n_points = len(x)
+    if n_control < 2:
+        raise ValueError("at least 2 control points are required")
+    if n_control > n_points:
+        raise ValueError("number of control points must not exceed number of track points")
+    degree = min(desired_degree, n_control - 1)
+
+    n_coef = n_control + degree if closed else n_control
+    t, domain = BSpline.uniform_knots(n_coef, degree, closed=closed)
+    u = chord_parameters(x, y, domain, closed=closed)
+    a = _ScipyBSpline.design_matrix(u, t, degree)
+    if closed:
+        # wrapped control points share coefficients with the first control points
+        rows = np.arange(n_coef)
+        fold = sparse.csr_array(
+            (np.ones(n_coef), (rows, rows % n_control)), shape=(n_coef, n_control)
+        )
+        a = a @ fold
+
+    a_t = a.T.tocsr()
+    ata = (a_t @ a).tocsc()
+    atb = a_t @ np.column_stack((x, y))
+
+    if closed:
+        cp = spsolve(ata, atb)
+        if not np.all(np.isfinite(cp)):
+            raise ValueError("too many control points for the given track")
+        cp = np.concatenate((cp, cp[0:degree, :]), axis=0)
+    else:
+        ab = np.zeros((degree + 1, n_control))
+        for i in range(degree + 1):
+            ab[i, :n_control - i] = ata.diagonal(-i)
+        try:
+            cp = solveh_banded(ab, atb, lower=True)
+        except LinAlgError as e:
+            raise ValueError("too many control points for the given track") from e
+
+    return BSpline(control=cp, knots=t, degree=degree, domain=domain)
+
+
+def max_deviation(spline: BSpline, x: ndarray, y: ndarray, closed=False) -> float:
+    """Maximum distance between points (x, y) and the spline at their chord-length parameters."""
+    u = chord_parameters(x, y, spline.domain, closed=closed)
+    x_s, y_s = spline.evaluate(u)
+    return float(np.max(np.hypot(x_s - x, y_s - y)))
+
+
+def fit_tolerance(
+    x: ndarray, y: ndarray, tolerance: float, desired_degree: int, closed=False,
+    max_control: int | None = None,
+) -> BSpline:
+    """Fit a B-spline with the smallest number of control points within the given tolerance.
+
+    The number of control points is doubled until the maximum deviation is below tolerance and
+    then refined by bisection. If the tolerance cannot be reached with max_control control points
+    (or with as many control points as the track supports), the spline with the most control points
+    that could be fitted is returned.
+    """
+    limit = len(x) if max_control is None else min(max_control, len(x))
+    low = 1
+    high = min(max(desired_degree + 1, 4), limit)
+    best = fit(x, y, high, desired_degree, closed=closed)
+    while max_deviation(best, x, y, closed=closed) > tolerance:
+        if high >= limit:
+            return best
+        n_control = min(2 * high, limit)
+        try:
+            spline = fit(x, y, n_control, desired_degree, closed=closed)
+        except ValueError:
+            return best
+        low = high
+        high = n_control
+        best = spline
+
+    while high - low > 1:
+        mid = (low + high) // 2
+        try:
+            spline = fit(x, y, mid, desired_degree, closed=closed)
+        except ValueError:
+            low = mid
+            continue
+        if max_deviation(spline, x, y, closed=closed) <= tolerance:
+            high = mid
+            best = spline
+        else:
+            low = mid
+    return best
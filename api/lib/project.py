@@ -0,0 +1,117 @@
+"""Fast validation of project files into a compact columnar representation.
+
+Control points are validated as plain dictionaries directly from the JSON bytes (instead of one
+`LatLonPoint` model per point) and stored as NumPy arrays per curve. Their value ranges are
+checked on the arrays. The accepted documents are the same as for the `Project` model.
+"""
+from dataclasses import dataclass
+from typing_extensions import TypedDict
+import numpy as np
+from numpy import ndarray
+from pydantic import ConfigDict, TypeAdapter, ValidationError
+from .types import ProjectInfo, ProjectColorMap, ProjectSettings
+
+
+class ProjectJsonError(ValueError):
+    """Project data is not valid JSON."""
+
+
+class ProjectSchemaError(ValueError):
+    """Project data does not respect the project JSON schema."""
+
+
+class _LatLonDict(TypedDict):
+    """Control point (range checked separately)."""
+    __pydantic_config__ = ConfigDict(extra='forbid')
+    lat: float
+    lon: float
+
+
+class _CurveDict(TypedDict):
+    """Curve."""
+    __pydantic_config__ = ConfigDict(extra='forbid')
+    name: str
+    controlPoints: list[_LatLonDict]
+    closed: bool
+
+
+class _ProjectDict(TypedDict):
+    """Project."""
+    __pydantic_config__ = ConfigDict(extra='forbid')
+    info: ProjectInfo
+    curves: list[_CurveDict]
+    colorMaps: list[ProjectColorMap]
+    settings: ProjectSettings
+
+
+_PROJECT_ADAPTER = TypeAdapter(_ProjectDict)
+
+
+@dataclass
+class ColumnarCurve:
+    """Curve with control points stored as arrays."""
+    name: str
+    lat: ndarray
+    lon: ndarray
+    closed: bool
+
+
+@dataclass
+class ColumnarProject:
+    """Project with control points stored as arrays."""
+    info: ProjectInfo
+    curves: list[ColumnarCurve]
+    colorMaps: list[ProjectColorMap]
+    settings: ProjectSettings
+
+    @staticmethod
+    def from_json(data: bytes | str) -> 'ColumnarProject':
+        """Validate project JSON.
+
+        :raises ProjectJsonError: if data is not valid JSON.
+        :raises ProjectSchemaError: if data does not respect the project JSON schema.
+        """
+        try:
+            value = _PROJECT_ADAPTER.validate_json(data)
+        except ValidationError as e:
+            if any(error['type'] == 'json_invalid' for error in e.errors()):
+                raise ProjectJsonError("The project file content is not valid JSON.") from e
+            raise ProjectSchemaError(str(e)) from e
+
+        curves = []
+        for i, curve in enumerate(value['curves']):
+            points = curve['controlPoints']
+            lat = np.fromiter((p['lat'] for p in points), dtype=float, count=len(points))
+            lon = np.fromiter((p['lon'] for p in points), dtype=float, count=len(points))
+            # written as negated in-range checks to also reject NaN
+            if not np.all((lat >= -90) & (lat <= 90)):
+                raise ProjectSchemaError(f"curves.{i}.controlPoints: lat out of range")
+            if not np.all((lon >= -180) & (lon <= 180)):
+                raise ProjectSchemaError(f"curves.{i}.controlPoints: lon out of range")
+            curves.append(
+                ColumnarCurve(name=curve['name'], lat=lat, lon=lon, closed=curve['closed'])
+            )
+        return ColumnarProject(
+            info=value['info'], curves=curves, colorMaps=value['colorMaps'],
+            settings=value['settings'],
+        )
+
+    def to_json(self) -> bytes:
+        """Serialize project to JSON (same format as the `Project` model)."""
+        value = {
+            'info': self.info,
+            'curves': [
+                {
+                    'name': curve.name,
+                    'controlPoints': [
+                        {'lat': lat, 'lon': lon}
+                        for lat, lon in zip(curve.lat.tolist(), curve.lon.tolist())
+                    ],
+                    'closed': curve.closed,
+                }
+                for curve in self.curves
+            ],
+            'colorMaps': self.colorMaps,
+            'settings': self.settings,
+        }
+        return _PROJECT_ADAPTER.dump_json(value)
@@ -5,6 +5,9 @@ from numpy import ndarray
 from scipy.interpolate import splev
 from .geo import arclen
 
+ARCLEN_NEWTON_ITERATIONS = 2
+GAUSS_NODES, GAUSS_WEIGHTS = np.polynomial.legendre.leggauss(3)
+
 
 @dataclass
 class BSpline:
@@ -31,6 +34,12 @@ class BSpline:
             cp = np.concatenate((cp, first), axis=0)
 
         n = int(cp.shape[0])
+        t, domain = BSpline.uniform_knots(n, degree, closed=closed)
+        return BSpline(control=cp, knots=t, degree=degree, domain=domain)
+
+    @staticmethod
+    def uniform_knots(n: int, degree: int, closed=False) -> tuple[ndarray, tuple[float, float]]:
+        """Uniform knot vector and domain for n (wrapped) control points."""
         if closed:
             t = np.linspace(0, 1, n + degree + 1, endpoint=True)
             u_start = t[degree]
@@ -41,15 +50,17 @@ class BSpline:
             t = np.append([0] * degree, t)
             t = np.append(t, [1] * degree)
             domain = (0, 1)
+        return t, domain
 
-        return BSpline(control=cp, knots=t, degree=degree, domain=domain)
-
-    def evaluate(self, u: ndarray) -> tuple[ndarray, ndarray]:
-        """Evaluate spline."""
+    def evaluate(self, u: ndarray, der: int = 0) -> tuple[ndarray, ndarray]:
+        """Evaluate spline (or its derivative of order der)."""
         x = self.control[:, 0]
         y = self.control[:, 1]
+        if der > self.degree:
+            zeros = np.zeros_like(np.asarray(u, dtype=float))
+            return zeros, zeros.copy()
         spline = (self.knots, [x, y], self.degree)
-        data = splev(u, spline)
+        data = splev(u, spline, der=der)
         x_s = data[0]
         y_s = data[1]
         return x_s, y_s
@@ -85,3 +96,40 @@ class BSpline:
             n_eval = max(round(n_eval * factor), n_eval + 1)
 
         return x_s, y_s
+
+    def segment_length(self, u_start: ndarray, u_end: ndarray) -> ndarray:
+        """Arc length between parameters u_start and u_end (Gauss-Legendre quadrature).
+
+        Intended for short segments, e.g. between neighboring entries of the arc length table.
+        """
+        u_start = np.asarray(u_start, dtype=float)
+        u_end = np.asarray(u_end, dtype=float)
+        half = (u_end - u_start) / 2
+        mid = (u_end + u_start) / 2
+        length = np.zeros(np.broadcast(u_start, u_end).shape)
+        for node, weight in zip(GAUSS_NODES, GAUSS_WEIGHTS):
+            dx, dy = self.evaluate(mid + half * node, der=1)
+            length = length + weight * np.hypot(dx, dy)
+        return length * half
+
+    def invert_arclen(self, s: ndarray, table: tuple[ndarray, ndarray]) -> ndarray:
+        """Spline parameter u at arc lengths s.
+
+        The table (u, s) of sampled parameters and arc lengths, e.g.
+        `SampledCurve.arclen_table`, is searched in O(log n) per value and interpolated
+        linearly; u is then refined with Newton iteration on the arc length within the table
+        interval.
+        """
+        u_t, s_t = table
+        s = np.clip(np.asarray(s, dtype=float), 0, s_t[-1])
+        k = np.clip(np.searchsorted(s_t, s, side='right') - 1, 0, len(s_t) - 2)
+        ds = s_t[k + 1] - s_t[k]
+        fraction = np.divide(s - s_t[k], ds, out=np.zeros_like(s), where=ds > 0)
+        u = u_t[k] + fraction * (u_t[k + 1] - u_t[k])
+        for _ in range(ARCLEN_NEWTON_ITERATIONS):
+            f = s_t[k] + self.segment_length(u_t[k], u) - s
+            dx, dy = self.evaluate(u, der=1)
+            v = np.hypot(dx, dy)
+            u = u - np.divide(f, v, out=np.zeros_like(f), where=v > 0)
+            u = np.clip(u, u_t[k], u_t[k + 1])
+        return u
@@ -0,0 +1,95 @@
+"""Reading of GPS tracks (GPX and GeoJSON)."""
+import json
+import xml.etree.ElementTree as ET
+import numpy as np
+from .globe import GlobePoint
+
+GPX_POINT_TAGS = ('trkpt', 'rtept')
+CHUNK_SIZE = 1024 * 1024
+
+
+def read_gpx(data: bytes | bytearray) -> GlobePoint:
+    """Read all track points (or route points) of a GPX file in document order."""
+    lat = []
+    lon = []
+    parser = ET.XMLPullParser(events=('end',))
+    view = memoryview(data)
+    try:
+        # feed slices of the buffer to avoid copying the whole file
+        for start in range(0, len(view), CHUNK_SIZE):
+            parser.feed(view[start:start + CHUNK_SIZE])
+            _collect_points(parser, lat, lon)
+        parser.close()
+        _collect_points(parser, lat, lon)
+    except (ET.ParseError, KeyError, ValueError) as e:
+        raise ValueError("invalid GPX file") from e
+    return _to_globe_point(lat, lon)
+
+
+def _collect_points(parser: ET.XMLPullParser, lat: list, lon: list):
+    """Append coordinates of all track points parsed so far."""
+    for _, element in parser.read_events():
+        tag = element.tag.rsplit('}', 1)[-1]
+        if tag in GPX_POINT_TAGS:
+            lat.append(float(element.attrib['lat']))
+            lon.append(float(element.attrib['lon']))
+            element.clear()
+
+
+def read_geojson(data: bytes | bytearray) -> GlobePoint:
+    """Read the coordinates of all LineString geometries of a GeoJSON file."""
+    try:
+        obj = json.loads(data)
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError("invalid GeoJSON file") from e
+    coordinates = []
+    _collect_lines(obj, coordinates)
+    try:
+        lon_lat = np.array(coordinates, dtype=float)[:, 0:2]
+    except (ValueError, IndexError) as e:
+        raise ValueError("invalid GeoJSON coordinates") from e
+    return _to_globe_point(lon_lat[:, 1], lon_lat[:, 0])
+
+
+def read_track(data: bytes | bytearray, filename: str | None = None) -> GlobePoint:
+    """Read a track from GPX or GeoJSON data (detected from file name or content)."""
+    name = (filename or '').lower()
+    if name.endswith('.gpx'):
+        return read_gpx(data)
+    if name.endswith(('.geojson', '.json')):
+        return read_geojson(data)
+    if data[:1024].lstrip()[:1] == b'<':
+        return read_gpx(data)
+    return read_geojson(data)
+
+
+def _collect_lines(obj, coordinates: list):
+    """Append coordinates of all line geometries in a GeoJSON object."""
+    if not isinstance(obj, dict):
+        raise ValueError("invalid GeoJSON object")
+    kind = obj.get('type')
+    if kind == 'FeatureCollection':
+        for feature in obj.get('features', []):
+            _collect_lines(feature, coordinates)
+    elif kind == 'Feature':
+        if obj.get('geometry') is not None:
+            _collect_lines(obj['geometry'], coordinates)
+    elif kind == 'GeometryCollection':
+        for geometry in obj.get('geometries', []):
+            _collect_lines(geometry, coordinates)
+    elif kind == 'LineString':
+        coordinates.extend(obj.get('coordinates', []))
+    elif kind == 'MultiLineString':
+        for line in obj.get('coordinates', []):
+            coordinates.extend(line)
+
+
+def _to_globe_point(lat, lon) -> GlobePoint:
+    """Create GlobePoint from lat/lon sequences after checking ranges."""
+    lat = np.asarray(lat, dtype=float)
+    lon = np.asarray(lon, dtype=float)
+    if len(lat) < 2:
+        raise ValueError("track must contain at least 2 points")
+    if np.any(np.abs(lat) > 90) or np.any(np.abs(lon) > 180):
+        raise ValueError("track coordinates out of range")
+    return GlobePoint(lat, lon, np.zeros_like(lat))
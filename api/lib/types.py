@@ -1,13 +1,15 @@
 """Type definitions."""
 from datetime import datetime
-from typing import Annotated
+from typing import Annotated, Literal
 from annotated_types import Len
 from pydantic import BaseModel, Field, model_validator, ConfigDict, StringConstraints
 from pydantic_string_url import HttpUrl
 
 
 InputList = Annotated[list[float], Len(2)]
+QueryList = Annotated[list[float], Len(1)]
 HexColor = Annotated[str, StringConstraints(pattern=r'^#[0-9a-fA-F]{6}$')]
+CurveField = Literal['lat', 'lon', 'distance', 'curvature', 'speed']
 
 
 class ControlPoints(BaseModel):
@@ -29,16 +31,68 @@ class CurveInput(BaseModel):
     desired_degree: Annotated[int, Field(strict=True, ge=1)]
     closed: bool
     max_distance: Annotated[float, Field(strict=True, gt=0)]
+    station_interval: Annotated[float, Field(strict=True, gt=0)] | None = None
+    stations: QueryList | None = None
+    fields: list[CurveField] | None = None
+    summary: bool = False
 
+    @model_validator(mode='after')
+    def check_stations(self):
+        """Check that at most one station option is given."""
+        if self.station_interval is not None and self.stations is not None:
+            raise ValueError("station_interval and stations must not be given both")
+        return self
 
-class CurveOutput(BaseModel):
-    """Outputs."""
-    degree: int
+
+class QueryPoints(BaseModel):
+    """Query points."""
+    lat: QueryList
+    lon: QueryList
+
+    @model_validator(mode='after')
+    def check_lengths(self):
+        """Check length consistency."""
+        if len(self.lat) != len(self.lon):
+            raise ValueError("lat and lon must have the same length")
+        return self
+
+
+class NearestInput(BaseModel):
+    """Nearest point inputs."""
+    curves: Annotated[list[CurveInput], Len(1)]
+    points: QueryPoints
+
+
+class NearestOutput(BaseModel):
+    """Nearest point outputs (one item per query point)."""
+    curve: list[int]
+    u: list[float]
+    distance: list[float]
+    offset: list[float]
     lat: list[float]
     lon: list[float]
-    distance: list[float]
-    curvature: list[float]
-    speed: list[float]
+
+
+class CurveSummary(BaseModel):
+    """Curve summary."""
+    length: float
+    min_radius: float | None
+    min_radius_distance: float
+    min_radius_lat: float
+    min_radius_lon: float
+    max_speed: float
+    speed_percentiles: dict[str, float]
+
+
+class CurveOutput(BaseModel):
+    """Outputs (fields that are not requested are omitted)."""
+    degree: int
+    lat: list[float] | None = None
+    lon: list[float] | None = None
+    distance: list[float] | None = None
+    curvature: list[float] | None = None
+    speed: list[float] | None = None
+    summary: CurveSummary | None = None
 
 
 class PublishInput(BaseModel):
@@ -0,0 +1,107 @@
+"""Production server: warm up the API once, then prefork uvicorn workers from the warm process.
+
+Workers are forked after all imports and the warmup are done, so they share the loaded modules
+(copy-on-write) and are ready to serve immediately. Crashed workers are replaced, with increasing
+delays if they keep failing right after starting.
+
+Usage: python serve.py [--host HOST] [--port PORT] [--workers N]
+"""
+import os
+import sys
+import time
+import signal
+import socket
+import argparse
+import uvicorn
+
+import api
+
+DEFAULT_WORKERS = 2  # each worker holds its own curve cache
+MIN_WORKER_LIFETIME = 10.0  # workers exiting earlier count as failed starts [s]
+RESTART_DELAY = 0.5  # delay after the first failed start, doubled for each further one [s]
+MAX_RESTART_DELAY = 30.0  # [s]
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Run the MapLineDraw API with preforked workers.")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=80)
+    parser.add_argument(
+        "--workers", type=int, default=int(os.environ.get("API_WORKERS", DEFAULT_WORKERS))
+    )
+    return parser.parse_args()
+
+
+def bind(host: str, port: int) -> socket.socket:
+    """Create the listening socket shared by all workers."""
+    sock = socket.socket(socket.AF_INET6 if ':' in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def spawn(sock: socket.socket, config: uvicorn.Config) -> int:
+    """Fork a worker serving on sock and return its pid."""
+    pid = os.fork()
+    if pid != 0:
+        return pid
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    server = uvicorn.Server(config)
+    server.run(sockets=[sock])
+    os._exit(0)  # pylint: disable=protected-access
+
+
+def main():
+    """Warm up, fork workers and supervise them until terminated."""
+    args = parse_args()
+    api.warmup()
+    # load protocol implementations and middleware in the parent so workers inherit them,
+    # workers skip the lifespan warmup since they are forked from the warm parent
+    config = uvicorn.Config(api.app, proxy_headers=True, lifespan="off")
+    config.load()
+    sock = bind(args.host, args.port)
+    workers = {spawn(sock, config): time.monotonic() for _ in range(max(args.workers, 1))}
+    failures = 0
+    print(f"Serving on {args.host}:{args.port} with {len(workers)} workers", flush=True)
+
+    stopping = False
+
+    def stop(signum, _frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(workers):
+            try:
+                os.kill(pid, signum)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    while workers:
+        try:
+            pid, _ = os.wait()
+        except ChildProcessError:
+            break
+        started = workers.pop(pid, None)
+        if started is None or stopping:
+            continue
+        # back off if workers keep failing shortly after starting
+        if time.monotonic() - started < MIN_WORKER_LIFETIME:
+            failures += 1
+        else:
+            failures = 0
+        delay = min(RESTART_DELAY * 2 ** (failures - 1), MAX_RESTART_DELAY) if failures else 0
+        print(f"Worker {pid} exited, starting a new one in {delay:.1f} s", flush=True)
+        time.sleep(delay)
+        if not stopping:
+            workers[spawn(sock, config)] = time.monotonic()
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()